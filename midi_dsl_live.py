@@ -12,12 +12,13 @@ Syntax Examples:
   stop                       # stop playback
 """
 
-import re
-import sched
+import queue
 import threading
+from array import array
 from time import perf_counter, sleep
-from dataclasses import dataclass
-from typing import List, Dict, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Dict, Iterator, NamedTuple, Optional
 
 try:
     import mido
@@ -28,30 +29,87 @@ except ImportError:
     print("Running in simulation mode (no actual MIDI output)")
     print()
 
-# MIDI note mapping (simple subset)
+# Pitch class of each note name
 NOTE_MAP = {
     'c': 0, 'd': 2, 'e': 4, 'f': 5, 'g': 7, 'a': 9, 'b': 11,
-    'c4': 60, 'd4': 62, 'e4': 64, 'f4': 65, 'g4': 67, 'a4': 69, 'b4': 71,
-    'c5': 72, 'd5': 74, 'e5': 76, 'f5': 77, 'g5': 79, 'a5': 81, 'b5': 83,
 }
 
-@dataclass
-class Note:
-    """Single MIDI note"""
+def _build_note_table() -> Dict[str, int]:
+    """Map every note token (c, c4, c#4, db5, 60, ...) to its MIDI pitch"""
+    table = {str(pitch): pitch for pitch in range(128)}
+    table.update(NOTE_MAP)
+    for name, pitch_class in NOTE_MAP.items():
+        for octave in range(10):
+            base = pitch_class + 12 * (octave + 1)  # c4 = 60
+            for accidental, step in (('', 0), ('#', 1), ('b', -1)):
+                pitch = base + step
+                if 0 <= pitch <= 127:
+                    table[f"{name}{accidental}{octave}"] = pitch
+    return table
+
+# All note names and MIDI numbers, precomputed so parsing is one lookup
+NOTE_TABLE = _build_note_table()
+
+@lru_cache(maxsize=None)
+def _transpose_table(semitones: int) -> bytes:
+    """bytes.translate table that shifts pitches and clamps them to 0-127"""
+    return bytes(max(0, min(127, p + semitones)) for p in range(256))
+
+def _parse_int(text: str) -> Optional[int]:
+    """Parse a signed integer, returning None instead of raising"""
+    digits = text[1:] if text[:1] in ('+', '-') else text
+    return int(text) if digits.isdecimal() else None
+
+# MIDI status bytes. Note off sorts before note on, so a repeated pitch
+# ending exactly where the next one starts is released first.
+NOTE_OFF = 0x80
+NOTE_ON = 0x90
+
+class Note(NamedTuple):
+    """Single MIDI note (a read-only row of a Pattern)"""
     pitch: int        # MIDI note number (0-127)
     velocity: int     # Volume (0-127)
     duration: float   # Length in beats
     offset: float     # Start time in beats
 
-@dataclass
+@dataclass(slots=True)
 class Pattern:
-    """A sequence of notes forming a pattern"""
+    """A sequence of notes forming a pattern, stored one array per field"""
     name: str
-    notes: List[Note]
+    pitch: array      # MIDI note numbers, typecode 'B'
+    velocity: array   # Volumes, typecode 'B'
+    duration: array   # Lengths in beats, typecode 'd'
+    offset: array     # Start times in beats, typecode 'd'
     tempo: int = 120
+    # Playback batches built by MIDIPlayer, reused until the notes change
+    _schedule: Optional[list] = field(default=None, init=False, repr=False,
+                                      compare=False)
+    _total_beats: Optional[float] = field(default=None, init=False, repr=False,
+                                          compare=False)
+    
+    def __len__(self):
+        return len(self.pitch)
+    
+    def total_beats(self) -> float:
+        """Beat at which the last note ends"""
+        if self._total_beats is None:
+            self._total_beats = max(
+                (o + d for o, d in zip(self.offset, self.duration)), default=0.0
+            )
+        return self._total_beats
+    
+    def invalidate(self):
+        """Drop cached playback data (call after changing notes)"""
+        self._schedule = None
+        self._total_beats = None
+    
+    def iter_notes(self) -> Iterator[Note]:
+        """Iterate over the notes as Note tuples"""
+        return map(Note._make,
+                   zip(self.pitch, self.velocity, self.duration, self.offset))
     
     def __repr__(self):
-        return f"Pattern({self.name}: {len(self.notes)} notes)"
+        return f"Pattern({self.name}: {len(self)} notes)"
 
 class DSLState:
     """Runtime state for the DSL"""
@@ -66,18 +124,45 @@ class DSLState:
         self.__init__()
 
 class MIDIPlayer:
-    """Handles MIDI playback using sched and mido"""
+    """Handles MIDI playback using a timed event thread and mido"""
+    
+    # Events this close together are sent as one batch (seconds)
+    SEND_WINDOW = 0.001
+    # Event.wait is only as precise as the OS timer (~15.6 ms on Windows),
+    # so the stop flag is waited on until this close to a deadline and the
+    # rest is slept with time.sleep (seconds)
+    SLEEP_MARGIN = 0.02
     
     def __init__(self):
         self.port = None
-        self.scheduler = None
-        self.scheduler_thread = None
-        self.active_notes = set()  # Track playing notes for cleanup
+        self._stop_flag = threading.Event()
+        self._idle = threading.Event()  # Set while nothing is playing
+        self._idle.set()
+        
+        # One long-lived playback thread, fed schedules through a queue
+        self._queue = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
+        self._active_mask = 0  # Bit n set while pitch n is sounding
+        
+        # One message of each kind, mutated and resent for every note
+        # (port.send serializes synchronously, so reuse is safe)
+        self._msg_on = None
+        self._msg_off = None
+        
+        # Direct rtmidi send for the open port (None -> go through mido)
+        self._send_raw = None
+        self._raw_on = [NOTE_ON, 0, 0]
+        self._raw_off = [NOTE_OFF, 0, 64]
         
         if MIDI_AVAILABLE:
+            self._msg_on = mido.Message('note_on', note=0, velocity=0)
+            self._msg_off = mido.Message('note_off', note=0)
+            
             try:
                 # Try to open default MIDI output
                 self.port = mido.open_output()
+                self._bind_port()
                 print(f"✓ MIDI output: {self.port.name}")
             except Exception as e:
                 print(f"✗ Could not open MIDI port: {e}")
@@ -111,9 +196,9 @@ class MIDIPlayer:
             return "MIDI not available"
         
         try:
-            # Close existing port
+            # Close existing port, once playback has stopped using it
             if self.port:
-                self.all_notes_off()
+                self.stop_playback()
                 self.port.close()
             
             # Open new port
@@ -124,36 +209,62 @@ class MIDIPlayer:
                 idx = int(port_name_or_index)
                 if 0 <= idx < len(ports):
                     self.port = mido.open_output(ports[idx])
+                    self._bind_port()
                     return f"Switched to port: {self.port.name}"
                 else:
                     return f"Port index {idx} out of range (0-{len(ports)-1})"
             except ValueError:
                 # Try as port name
                 self.port = mido.open_output(port_name_or_index)
+                self._bind_port()
                 return f"Switched to port: {self.port.name}"
                 
         except Exception as e:
             return f"Error setting port: {e}"
     
+    def _bind_port(self):
+        """Look up a raw rtmidi send for the current port, if it has one"""
+        # mido's rtmidi backend keeps its rtmidi.MidiOut in ._rt; other
+        # backends don't, and fall back to port.send(Message)
+        rt = getattr(self.port, '_rt', None)
+        self._send_raw = getattr(rt, 'send_message', None)
+    
     def send_note_on(self, pitch: int, velocity: int):
         """Send MIDI note on"""
         if self.port:
-            msg = mido.Message('note_on', note=pitch, velocity=velocity)
-            self.port.send(msg)
-            self.active_notes.add(pitch)
+            if self._send_raw:
+                buf = self._raw_on
+                buf[1] = pitch
+                buf[2] = velocity
+                self._send_raw(buf)
+            else:
+                msg = self._msg_on
+                msg.note = pitch
+                msg.velocity = velocity
+                self.port.send(msg)
+            self._active_mask |= 1 << pitch
     
     def send_note_off(self, pitch: int):
         """Send MIDI note off"""
         if self.port:
-            msg = mido.Message('note_off', note=pitch)
-            self.port.send(msg)
-            self.active_notes.discard(pitch)
+            if self._send_raw:
+                buf = self._raw_off
+                buf[1] = pitch
+                self._send_raw(buf)
+            else:
+                msg = self._msg_off
+                msg.note = pitch
+                self.port.send(msg)
+            self._active_mask &= ~(1 << pitch)
     
     def all_notes_off(self):
         """Emergency: turn off all notes"""
         if self.port:
-            for pitch in list(self.active_notes):
-                self.send_note_off(pitch)
+            # Walk the set bits, lowest pitch first
+            mask = self._active_mask
+            while mask:
+                self.send_note_off((mask & -mask).bit_length() - 1)
+                mask &= mask - 1
             # Also send MIDI all notes off message
             for channel in range(16):
                 self.port.send(mido.Message('control_change', 
@@ -162,69 +273,96 @@ class MIDIPlayer:
                                            channel=channel))
     
     def play_pattern(self, pattern: Pattern):
-        """Play a pattern using the scheduler"""
+        """Play a pattern in a background thread"""
         if not self.port:
             return "No MIDI output available (use 'ports' to list available ports)"
         
-        # Cancel any existing scheduler
-        if self.scheduler_thread and self.scheduler_thread.is_alive():
+        if not self._idle.is_set():
             return "Already playing (use 'stop' first)"
         
-        # Create new scheduler
-        self.scheduler = sched.scheduler(perf_counter, sleep)
+        # Replays of an unchanged pattern reuse its schedule
+        batches = pattern._schedule
+        if batches is None:
+            batches = pattern._schedule = self._build_batches(pattern)
         
+        self._stop_flag.clear()
+        self._idle.clear()
+        self._queue.put(batches)
+        
+        # Calculate total duration
+        if len(pattern):
+            beat_duration = 60.0 / pattern.tempo
+            total_duration = pattern.total_beats() * beat_duration
+            return f"♪ Playing '{pattern.name}' ({total_duration:.2f}s, {pattern.tempo} BPM)"
+        return "Pattern is empty"
+    
+    def _build_batches(self, pattern: Pattern):
+        """Time-ordered (time, [(status, pitch, velocity), ...]) batches"""
         # Calculate beat duration in seconds
         beat_duration = 60.0 / pattern.tempo
         
         # Add 2ms latency compensation for better timing
         LATENCY_COMP = 0.002
         
-        # Schedule all notes
-        for note in pattern.notes:
-            # Schedule note on
+        # Merge every note on/off into one time-ordered event list
+        events = []
+        for note in pattern.iter_notes():
             note_on_time = (note.offset * beat_duration) + LATENCY_COMP
-            self.scheduler.enter(
-                note_on_time,
-                1,  # priority
-                self.send_note_on,
-                argument=(note.pitch, note.velocity)
-            )
-            
-            # Schedule note off
             note_off_time = note_on_time + (note.duration * beat_duration)
-            self.scheduler.enter(
-                note_off_time,
-                1,
-                self.send_note_off,
-                argument=(note.pitch,)
-            )
-        
-        # Run scheduler in background thread
-        def run_scheduler():
-            try:
-                self.scheduler.run()
-            except Exception as e:
-                print(f"\nScheduler error: {e}")
-        
-        self.scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        self.scheduler_thread.start()
-        
-        # Calculate total duration
-        if pattern.notes:
-            total_duration = max(n.offset + n.duration for n in pattern.notes) * beat_duration
-            return f"♪ Playing '{pattern.name}' ({total_duration:.2f}s, {pattern.tempo} BPM)"
-        return "Pattern is empty"
+            events.append((note_on_time, NOTE_ON, note.pitch, note.velocity))
+            events.append((note_off_time, NOTE_OFF, note.pitch, 0))
+        events.sort()
+        
+        # Events within the send window of a batch's first event (chords,
+        # note offs meeting note ons) go out together on one wake-up
+        batches = []
+        for event_time, status, pitch, velocity in events:
+            if batches and event_time - batches[-1][0] <= self.SEND_WINDOW:
+                batches[-1][1].append((status, pitch, velocity))
+            else:
+                batches.append((event_time, [(status, pitch, velocity)]))
+        return batches
+    
+    def _worker_loop(self):
+        """Play queued schedules one at a time (None ends the thread)"""
+        while True:
+            batches = self._queue.get()
+            if batches is None:
+                break
+            self._run_batches(batches)
+            self._idle.set()
+    
+    def _run_batches(self, batches):
+        """Send each batch of events at its time, measured from now"""
+        try:
+            t0 = perf_counter()
+            for batch_time, batch in batches:
+                # Wait out most of the gap on the stop flag, so a stop wakes
+                # us early, then sleep precisely up to the deadline
+                deadline = t0 + batch_time
+                delay = deadline - perf_counter()
+                if delay > self.SLEEP_MARGIN:
+                    self._stop_flag.wait(delay - self.SLEEP_MARGIN)
+                    delay = deadline - perf_counter()
+                if delay > 0 and not self._stop_flag.is_set():
+                    sleep(delay)
+                if self._stop_flag.is_set():
+                    break
+                
+                for status, pitch, velocity in batch:
+                    if status == NOTE_ON:
+                        self.send_note_on(pitch, velocity)
+                    else:
+                        self.send_note_off(pitch)
+        except Exception as e:
+            print(f"\nScheduler error: {e}")
     
     def stop_playback(self):
         """Stop current playback"""
-        # Clear scheduler
-        if self.scheduler:
-            # Empty the queue
-            for event in list(self.scheduler.queue):
-                try:
-                    self.scheduler.cancel(event)
-                except ValueError:
-                    pass
+        # Tell the playback thread to drop its remaining events, and let it
+        # finish its last send before notes are released
+        self._stop_flag.set()
+        self._idle.wait(timeout=1.0)
         
         # Turn off all notes
         self.all_notes_off()
@@ -234,6 +372,7 @@ class MIDIPlayer:
     def cleanup(self):
         """Clean up resources"""
         self.stop_playback()
+        self._queue.put(None)
         if self.port:
             self.port.close()
 
@@ -244,30 +383,41 @@ class DSLInterpreter:
         self.state = DSLState()
         self.player = MIDIPlayer()
         
+        # Command name -> handler; every handler takes the argument list
+        self._dispatch = {
+            "pat": self.cmd_pattern,
+            "seq": self.cmd_sequence,
+            "vel": self.cmd_velocity,
+            "len": self.cmd_length,
+            "tempo": self.cmd_tempo,
+            "play": self.cmd_play,
+            "stop": self.cmd_stop,
+            "mod": self.cmd_modify,
+            "list": self.cmd_list,
+            "show": self.cmd_show,
+            "del": self.cmd_delete,
+            "clear": self.cmd_clear,
+            "ports": self.cmd_ports,
+            "port": self.cmd_port,
+            "help": self.cmd_help,
+        }
+        
     def parse_note(self, token: str) -> Optional[int]:
         """Convert note name or number to MIDI pitch"""
-        # Try direct MIDI number
-        if token.isdigit():
-            pitch = int(token)
-            return pitch if 0 <= pitch <= 127 else None
+        # Try note name or MIDI number (e.g., "c4", "db5", "60")
+        pitch = NOTE_TABLE.get(token)
+        if pitch is not None:
+            return pitch
         
-        # Try note name
-        token = token.lower()
-        if token in NOTE_MAP:
-            return NOTE_MAP[token]
-        
-        # Try note with octave (e.g., "c#4", "db5")
-        match = re.match(r'([a-g])([#b]?)(\d)', token)
-        if match:
-            note, accidental, octave = match.groups()
-            pitch = NOTE_MAP[note] + (12 * int(octave))
-            if accidental == '#':
-                pitch += 1
-            elif accidental == 'b':
-                pitch -= 1
+        # Try other spellings of a MIDI number (e.g., "060")
+        if token.isdecimal():
+            pitch = int(token)
             return pitch if 0 <= pitch <= 127 else None
         
-        return None
+        # Try upper-case note name (e.g., "C#4"); lower-case ones already missed
+        if token.islower():
+            return None
+        return NOTE_TABLE.get(token.lower())
     
     def execute(self, line: str) -> str:
         """Execute a DSL command and return result"""
@@ -279,75 +429,18 @@ class DSLInterpreter:
         if not tokens:
             return ""
         
-        cmd = tokens[0].lower()
+        # Commands are almost always typed lower-case; skip the copy then
+        cmd = tokens[0]
+        if not cmd.islower():
+            cmd = cmd.lower()
         args = tokens[1:]
         
+        handler = self._dispatch.get(cmd)
+        if handler is None:
+            return f"Unknown command: {cmd} (try 'help')"
+        
         try:
-            # PATTERN DEFINITION
-            if cmd == "pat":
-                return self.cmd_pattern(args)
-            
-            # SEQUENCE DEFINITION (shorthand)
-            elif cmd == "seq":
-                return self.cmd_sequence(args)
-            
-            # SET VELOCITY
-            elif cmd == "vel":
-                return self.cmd_velocity(args)
-            
-            # SET NOTE LENGTH
-            elif cmd == "len":
-                return self.cmd_length(args)
-            
-            # SET TEMPO
-            elif cmd == "tempo":
-                return self.cmd_tempo(args)
-            
-            # PLAY PATTERN
-            elif cmd == "play":
-                return self.cmd_play(args)
-            
-            # STOP PLAYING
-            elif cmd == "stop":
-                return self.cmd_stop(args)
-            
-            # MODIFY PATTERN
-            elif cmd == "mod":
-                return self.cmd_modify(args)
-            
-            # LIST PATTERNS
-            elif cmd == "list":
-                return self.cmd_list()
-            
-            # SHOW PATTERN
-            elif cmd == "show":
-                return self.cmd_show(args)
-            
-            # DELETE PATTERN
-            elif cmd == "del":
-                return self.cmd_delete(args)
-            
-            # CLEAR ALL
-            elif cmd == "clear":
-                self.state.reset()
-                return "Cleared all patterns and state"
-            
-            # MIDI PORTS
-            elif cmd == "ports":
-                return self.player.list_ports()
-            
-            elif cmd == "port":
-                if not args:
-                    return "Usage: port <name_or_index>"
-                return self.player.set_port(args[0])
-            
-            # HELP
-            elif cmd == "help":
-                return self.cmd_help()
-            
-            else:
-                return f"Unknown command: {cmd} (try 'help')"
-                
+            return handler(args)
         except Exception as e:
             return f"Error: {str(e)}"
     
@@ -357,12 +450,10 @@ class DSLInterpreter:
             return "Usage: pat <name> <beats> <note1> [note2 ...]"
         
         name = args[0]
-        try:
-            beats = int(args[1])
-        except ValueError:
+        beats = _parse_int(args[1])
+        if beats is None:
             return f"Invalid beats: {args[1]}"
         
-        notes = []
         note_tokens = args[2:]
         
         if not note_tokens:
@@ -370,62 +461,54 @@ class DSLInterpreter:
         
         beat_duration = beats / len(note_tokens)
         
-        for i, token in enumerate(note_tokens):
-            pitch = self.parse_note(token)
-            if pitch is None:
-                return f"Invalid note: {token}"
-            
-            note = Note(
-                pitch=pitch,
-                velocity=self.state.current_vel,
-                duration=self.state.current_len,
-                offset=i * beat_duration
-            )
-            notes.append(note)
+        pitches = [self.parse_note(token) for token in note_tokens]
+        if None in pitches:
+            return f"Invalid note: {note_tokens[pitches.index(None)]}"
         
-        pattern = Pattern(name=name, notes=notes, tempo=self.state.current_tempo)
+        pattern = self._build_pattern(name, pitches, beat_duration)
         self.state.patterns[name] = pattern
         
-        return f"Created pattern '{name}' with {len(notes)} notes over {beats} beats"
+        return f"Created pattern '{name}' with {len(pattern)} notes over {beats} beats"
     
     def cmd_sequence(self, args: List[str]) -> str:
         """seq <note1> <note2> ... (quick sequential pattern)"""
         if not args:
             return "Usage: seq <note1> [note2 ...]"
         
-        notes = []
-        for i, token in enumerate(args):
-            pitch = self.parse_note(token)
-            if pitch is None:
-                return f"Invalid note: {token}"
-            
-            note = Note(
-                pitch=pitch,
-                velocity=self.state.current_vel,
-                duration=self.state.current_len,
-                offset=i * self.state.current_len
-            )
-            notes.append(note)
+        pitches = [self.parse_note(token) for token in args]
+        if None in pitches:
+            return f"Invalid note: {args[pitches.index(None)]}"
         
         # Store in temp pattern
-        pattern = Pattern(name="_seq", notes=notes, tempo=self.state.current_tempo)
+        pattern = self._build_pattern("_seq", pitches, self.state.current_len)
         self.state.patterns["_seq"] = pattern
         
-        return f"Sequence: {len(notes)} notes → MIDI: {[n.pitch for n in notes]}"
+        return f"Sequence: {len(pattern)} notes → MIDI: {pitches}"
+    
+    def _build_pattern(self, name: str, pitches: List[int], step: float) -> Pattern:
+        """Pattern of evenly spaced notes using the current vel/len/tempo"""
+        count = len(pitches)
+        return Pattern(
+            name=name,
+            pitch=array('B', pitches),
+            velocity=array('B', [self.state.current_vel]) * count,
+            duration=array('d', [self.state.current_len]) * count,
+            offset=array('d', [i * step for i in range(count)]),
+            tempo=self.state.current_tempo
+        )
     
     def cmd_velocity(self, args: List[str]) -> str:
         """vel <0-127>"""
         if len(args) != 1:
             return f"Usage: vel <0-127> (current: {self.state.current_vel})"
         
-        try:
-            vel = int(args[0])
-            if not 0 <= vel <= 127:
-                return "Velocity must be 0-127"
-            self.state.current_vel = vel
-            return f"Velocity set to {vel}"
-        except ValueError:
+        vel = _parse_int(args[0])
+        if vel is None:
             return f"Invalid velocity: {args[0]}"
+        if not 0 <= vel <= 127:
+            return "Velocity must be 0-127"
+        self.state.current_vel = vel
+        return f"Velocity set to {vel}"
     
     def cmd_length(self, args: List[str]) -> str:
         """len <beats>"""
@@ -446,14 +529,13 @@ class DSLInterpreter:
         if len(args) != 1:
             return f"Usage: tempo <bpm> (current: {self.state.current_tempo})"
         
-        try:
-            tempo = int(args[0])
-            if not 20 <= tempo <= 300:
-                return "Tempo must be 20-300 BPM"
-            self.state.current_tempo = tempo
-            return f"Tempo set to {tempo} BPM"
-        except ValueError:
+        tempo = _parse_int(args[0])
+        if tempo is None:
             return f"Invalid tempo: {args[0]}"
+        if not 20 <= tempo <= 300:
+            return "Tempo must be 20-300 BPM"
+        self.state.current_tempo = tempo
+        return f"Tempo set to {tempo} BPM"
     
     def cmd_play(self, args: List[str]) -> str:
         """play <pattern>"""
@@ -483,42 +565,50 @@ class DSLInterpreter:
             return f"Pattern '{name}' not found"
         
         pattern = self.state.patterns[name]
-        op = args[1].lower()
+        op = args[1]
+        if not op.islower():
+            op = op.lower()
         params = args[2:]
         
         # TRANSPOSE
         if op == "trans":
             if not params:
                 return "Usage: mod <pat> trans <semitones>"
-            try:
-                semitones = int(params[0])
-                for note in pattern.notes:
-                    note.pitch = max(0, min(127, note.pitch + semitones))
-                return f"Transposed '{name}' by {semitones} semitones"
-            except ValueError:
+            semitones = _parse_int(params[0])
+            if semitones is None:
                 return f"Invalid semitones: {params[0]}"
+            # Shifts past +/-127 all clamp the same way, which also bounds
+            # the number of cached tables
+            table = _transpose_table(max(-127, min(127, semitones)))
+            pattern.pitch = array('B', pattern.pitch.tobytes().translate(table))
+            pattern.invalidate()
+            return f"Transposed '{name}' by {semitones} semitones"
         
         # REVERSE
         elif op == "rev":
-            pattern.notes.reverse()
-            # Recalculate offsets
-            max_offset = max(n.offset for n in pattern.notes)
-            for note in pattern.notes:
-                note.offset = max_offset - note.offset
+            pattern.pitch.reverse()
+            pattern.velocity.reverse()
+            pattern.duration.reverse()
+            # Reflect offsets while reading them back to front
+            max_offset = max(pattern.offset)
+            pattern.offset = array(
+                'd', [max_offset - o for o in reversed(pattern.offset)]
+            )
+            pattern.invalidate()
             return f"Reversed '{name}'"
         
         # DOUBLE TEMPO
         elif op == "double":
-            for note in pattern.notes:
-                note.offset *= 0.5
-                note.duration *= 0.5
+            pattern.offset = array('d', [o * 0.5 for o in pattern.offset])
+            pattern.duration = array('d', [d * 0.5 for d in pattern.duration])
+            pattern.invalidate()
             return f"Doubled speed of '{name}'"
         
         # HALF TEMPO
         elif op == "half":
-            for note in pattern.notes:
-                note.offset *= 2
-                note.duration *= 2
+            pattern.offset = array('d', [o * 2 for o in pattern.offset])
+            pattern.duration = array('d', [d * 2 for d in pattern.duration])
+            pattern.invalidate()
             return f"Halved speed of '{name}'"
         
         # TIME SHIFT
@@ -527,8 +617,8 @@ class DSLInterpreter:
                 return "Usage: mod <pat> shift <beats>"
             try:
                 shift = float(params[0])
-                for note in pattern.notes:
-                    note.offset += shift
+                pattern.offset = array('d', [o + shift for o in pattern.offset])
+                pattern.invalidate()
                 return f"Shifted '{name}' by {shift} beats"
             except ValueError:
                 return f"Invalid shift: {params[0]}"
@@ -536,14 +626,14 @@ class DSLInterpreter:
         else:
             return f"Unknown operation: {op}"
     
-    def cmd_list(self) -> str:
+    def cmd_list(self, args: List[str]) -> str:
         """List all patterns"""
         if not self.state.patterns:
             return "No patterns defined"
         
         lines = ["Patterns:"]
         for name, pat in self.state.patterns.items():
-            lines.append(f"  {name}: {len(pat.notes)} notes, {pat.tempo} BPM")
+            lines.append(f"  {name}: {len(pat)} notes, {pat.tempo} BPM")
         return "\n".join(lines)
     
     def cmd_show(self, args: List[str]) -> str:
@@ -558,9 +648,9 @@ class DSLInterpreter:
         pattern = self.state.patterns[name]
         lines = [f"Pattern '{name}':"]
         lines.append(f"  Tempo: {pattern.tempo} BPM")
-        lines.append(f"  Notes ({len(pattern.notes)}):")
+        lines.append(f"  Notes ({len(pattern)}):")
         
-        for i, note in enumerate(pattern.notes):
+        for i, note in enumerate(pattern.iter_notes()):
             lines.append(
                 f"    {i+1}. pitch={note.pitch} vel={note.velocity} "
                 f"dur={note.duration:.2f} @{note.offset:.2f}b"
@@ -579,7 +669,22 @@ class DSLInterpreter:
             return f"Deleted pattern '{name}'"
         return f"Pattern '{name}' not found"
     
-    def cmd_help(self) -> str:
+    def cmd_clear(self, args: List[str]) -> str:
+        """Clear all patterns and state"""
+        self.state.reset()
+        return "Cleared all patterns and state"
+    
+    def cmd_ports(self, args: List[str]) -> str:
+        """List MIDI output ports"""
+        return self.player.list_ports()
+    
+    def cmd_port(self, args: List[str]) -> str:
+        """port <name_or_index>"""
+        if not args:
+            return "Usage: port <name_or_index>"
+        return self.player.set_port(args[0])
+    
+    def cmd_help(self, args: List[str]) -> str:
         """Show help text"""
         return """
 MIDI Pattern DSL - Commands:
@@ -16,6 +16,10 @@ show test
 # Test sequence
 seq 60 64 67
 
+# Test note names (c4 = 60 for every octave, case, zero-padded numbers)
+seq c#4 db4 c3 c6 C#4 060
+show _seq
+
 # Test settings
 vel 100
 len 0.5